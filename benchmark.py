@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+'''
+    Measure how long chess.py takes to start in batch mode and to
+    replay a long script. Run it before and after changes to the board
+    or the move generation and compare the numbers.
+
+    Usage: benchmark.py [MOVES] [RUNS] [LOG]
+
+    Prints one JSON line of results, and appends it to LOG if given,
+    so that runs can be compared over time.
+'''
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+GAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), "chess.py")
+
+# Knights out and back again, legal for as long as we like
+SHUFFLE = ('G1F3', 'G8F6', 'F3G1', 'F6G8')
+
+def run(script, runs):
+    ''' Best wall time of `runs` batch runs of `script` '''
+    best = None
+    devnull = open(os.devnull, 'w')
+    for i in range(runs):
+        started = time.time()
+        with open(script) as stdin:
+            subprocess.check_call([sys.executable, GAME, '--batch'],
+                                  stdin=stdin, stdout=devnull)
+        elapsed = time.time() - started
+        if best is None or elapsed < best: best = elapsed
+    devnull.close()
+    return best
+
+def revision():
+    ''' Current git commit, if there is one '''
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=os.path.dirname(GAME), stderr=open(os.devnull, 'w')).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main(moves=10000, runs=3, log=None):
+    moves, runs = int(moves), int(runs)
+    with tempfile.NamedTemporaryFile(suffix='.txt') as empty:
+        start = run(empty.name, runs)
+    with tempfile.NamedTemporaryFile(suffix='.txt') as script:
+        for i in range(moves):
+            script.write(SHUFFLE[i % len(SHUFFLE)] + "\n")
+        script.flush()
+        replay = run(script.name, runs)
+
+    result = {
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'revision': revision(),
+        'python': platform.python_version(),
+        'moves': moves,
+        'start_ms': round(start * 1000, 1),
+        'replay_s': round(replay, 3),
+        'ms_per_move': round((replay - start) * 1000 / moves, 3),
+    }
+    line = json.dumps(result, sort_keys=True)
+    print line
+    if log is not None:
+        with open(log, 'a') as out:
+            out.write(line + "\n")
+
+if __name__ == '__main__':
+    main(*sys.argv[1:4])
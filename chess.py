@@ -8,6 +8,19 @@ if sys.version_info[0] > 2:
 
 from chesslib import board
 
+USAGE = '''Usage: game.py [OPTION] [SCRIPT]\n\n\tPlay a game of chess\n\n\tOptions:\n\t -c, --console\tplay in console mode\n\t -b, --batch\tplay the moves in SCRIPT (or stdin) without a GUI,\n\t\t\tthen print the final position. Starts from the\n\t\t\tstandard position, not state.fen; use \"load FEN\"\n\t\t\tin the script to set one\n\n'''
+
+# Batch mode always starts from the standard position
+if len(sys.argv) > 1 and sys.argv[1] in ('--batch', '-b'):
+    from chesslib.batch import display
+    game = board.Board()
+    if len(sys.argv) > 2:
+        with open(sys.argv[2]) as script:
+            failed = display(game, script)
+    else:
+        failed = display(game)
+    exit(1 if failed else 0)
+
 # Load a save if it exists
 
 if os.path.exists("state.fen"):
@@ -16,14 +29,14 @@ if os.path.exists("state.fen"):
 else:
     game = board.Board()
 
-# Choose display method
+# Choose display method, GUI modules are only imported when used
 if len(sys.argv) > 1:
     if sys.argv[1] in ('--console', '-c'):
         from chesslib.gui_console import display
         display(game)
         exit(0)
     elif sys.argv[1] in ('--help', '-h'):
-        print '''Usage: game.py [OPTION]\n\n\tPlay a game of chess\n\n\tOptions:\n\t -c, --console\tplay in console mode\n\n'''
+        print USAGE
         exit(0)
 
 try:
@@ -0,0 +1,455 @@
+import json
+import os
+import re
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+
+import board
+
+# Centipawn value of each piece, indexed by upper case abbriviation
+PIECE_VALUES = { 'P': 100, 'N': 320, 'B': 330, 'R': 500, 'Q': 900, 'K': 0 }
+MATE_SCORE = 100000
+# Plies of captures searched past the nominal depth
+QUIESCENCE_DEPTH = 4
+
+SAN_REGEX = re.compile(r"^([NBRQK])?([a-h])?([1-8])?x?([a-h][1-8])(=[NBRQ])?[+#]?[!?]*$")
+HEADER_REGEX = re.compile(r'^\[(\w+)\s+"(.*)"\]\s*$')
+COMMENT_REGEX = re.compile(r"\{[^}]*\}|;[^\n]*")
+MOVE_NUMBER_REGEX = re.compile(r"^\d+\.+")
+RESULTS = ('1-0', '0-1', '1/2-1/2', '*')
+
+class UnsupportedMove(board.ChessError): pass
+class _Timeout(Exception): pass
+
+class PositionCache(object):
+    '''
+        PositionCache
+
+        A size-bounded LRU mapping of search keys to scores.
+        Opening positions repeat across games, so one cache is shared
+        by every game analysed in the same process.
+    '''
+
+    def __init__(self, size=100000):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        score = self._entries.pop(key, None)
+        if score is None:
+            self.misses += 1
+            return None
+        self._entries[key] = score
+        self.hits += 1
+        return score
+
+    def put(self, key, score):
+        self._entries.pop(key, None)
+        self._entries[key] = score
+        if len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+class DiskPositionCache(object):
+    '''
+        DiskPositionCache
+
+        The same LRU kept in a sqlite file, so that worker processes,
+        and later runs, share the scores they find.
+
+        Lookups are answered from an in-memory PositionCache first.
+        Writes, including the recency of every hit, are queued and
+        written in one transaction by flush(), every `flush_every`
+        operations. Recency is a counter, not a timestamp, so that
+        entries never tie.
+    '''
+
+    def __init__(self, path, size=100000, memory_size=10000, flush_every=100):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self.flush_every = flush_every
+        self._memory = PositionCache(min(size, memory_size))
+        # (key, score) to write, score None only marks the key as used
+        self._pending = []
+        self._db = sqlite3.connect(path, timeout=60)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS positions "
+                         "(key TEXT PRIMARY KEY, score INTEGER, used INTEGER)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS positions_used "
+                         "ON positions (used)")
+        self._db.commit()
+
+    def __len__(self):
+        self.flush()
+        return self._db.execute("SELECT COUNT(*) FROM positions").fetchone()[0]
+
+    def get(self, key):
+        score = self._memory.get(key)
+        if score is None:
+            row = self._db.execute("SELECT score FROM positions WHERE key = ?",
+                                   (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            score = row[0]
+            self._memory.put(key, score)
+        self.hits += 1
+        self._queue(key, None)
+        return score
+
+    def put(self, key, score):
+        self._memory.put(key, score)
+        self._queue(key, score)
+
+    def _queue(self, key, score):
+        self._pending.append((key, score))
+        if len(self._pending) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        '''
+            Write the queued scores and hits, then trim the table back
+            to `size` rows by dropping the least recently used.
+        '''
+        if not self._pending: return
+        next_used = "(SELECT IFNULL(MAX(used), 0) + 1 FROM positions)"
+        for key, score in self._pending:
+            if score is None:
+                self._db.execute("UPDATE positions SET used = %s WHERE key = ?"
+                                 % next_used, (key,))
+            else:
+                self._db.execute("INSERT OR REPLACE INTO positions "
+                                 "VALUES (?, ?, %s)" % next_used, (key, score))
+        self._db.execute("DELETE FROM positions WHERE used < "
+                         "(SELECT used FROM positions ORDER BY used DESC "
+                         "LIMIT 1 OFFSET ?)", (self.size - 1,))
+        self._db.commit()
+        self._pending = []
+
+    def close(self):
+        self.flush()
+        self._db.close()
+
+def position_key(chessboard):
+    '''
+        Key identifying a position: the FEN without the move counters
+    '''
+    return " ".join(chessboard.export().split(' ')[:4])
+
+def search_key(chessboard, depth):
+    ''' Cache key for a search of the position `depth` plies deep '''
+    return "%s|%d" % (position_key(chessboard), depth)
+
+def material(chessboard):
+    ''' Material balance in centipawns from white's point of view '''
+    score = 0
+    for piece in chessboard.values():
+        value = PIECE_VALUES[piece.abbriviation.upper()]
+        if piece.color == 'white': score += value
+        else: score -= value
+    return score
+
+def _negamax(chessboard, color, depth, quiescence=QUIESCENCE_DEPTH,
+             deadline=None):
+    '''
+        Score for `color` to move, searching pseudo-legal moves
+        `depth` plies deep and then captures only, so that the score
+        is not taken in the middle of an exchange.
+        Capturing the king ends the line. Raises _Timeout once the
+        `deadline` (a time.time() value) has passed.
+    '''
+    if deadline is not None and time.time() > deadline:
+        raise _Timeout
+    captures_only = depth == 0
+    if captures_only:
+        # Standing pat is always an option when only captures are searched
+        best = material(chessboard)
+        if color == 'black': best = -best
+        if quiescence == 0: return best
+        quiescence -= 1
+    else:
+        depth -= 1
+        best = None
+
+    enemy = chessboard.get_enemy(color)
+    for p1 in chessboard.occupied(color):
+        piece = chessboard[p1]
+        for p2 in piece.possible_moves(p1):
+            captured = chessboard[p2]
+            if chessboard.is_king(captured): return MATE_SCORE
+            if captures_only and captured is None: continue
+            # Make the move, search, then take it back
+            chessboard._do_move(p1, p2)
+            try:
+                score = -_negamax(chessboard, enemy, depth, quiescence,
+                                  deadline)
+            finally:
+                chessboard._undo_move(p1, p2, piece, captured)
+            if best is None or score > best: best = score
+
+    if best is None:
+        # No moves at all, fall back to the static score
+        return _negamax(chessboard, color, 0, 0)
+    return best
+
+def evaluate(chessboard, depth=1, time_limit=None, cache=None):
+    '''
+        Evaluate the position in centipawns from white's point of view.
+
+        With `time_limit` (seconds) the search deepens one ply at a time
+        up to `depth`. A ply that runs out of time is thrown away. The
+        deepest finished ply with the same parity as `depth` is used,
+        so that consecutive positions do not swing between odd and even
+        depths. Only scores that reached `depth` are cached.
+    '''
+    key = search_key(chessboard, depth)
+    if cache is not None:
+        score = cache.get(key)
+        if score is not None: return score
+
+    color = chessboard.player_turn
+    if time_limit:
+        deadline = time.time() + time_limit
+        # The bare material count, in case not even one ply finishes
+        scores = {-1: _negamax(chessboard, color, 0, 0)}
+        for searched in range(depth + 1):
+            try:
+                scores[searched] = _negamax(chessboard, color, searched,
+                                            deadline=deadline)
+            except _Timeout:
+                break
+        finished = [level for level in scores if level >= 0]
+        same_parity = [level for level in finished if level % 2 == depth % 2]
+        reached = max(same_parity or finished or [-1])
+        score = scores[reached]
+    else:
+        reached = depth
+        score = _negamax(chessboard, color, depth)
+    if color == 'black': score = -score
+
+    if cache is not None and reached == depth:
+        cache.put(key, score)
+    return score
+
+def parse_san(chessboard, san):
+    '''
+        Resolve a SAN move (e.g. Nbd7, exd5) to a pair of coordinates
+        for Board.move. Raises UnsupportedMove for castling, promotion
+        and en passant, which Board does not implement yet.
+    '''
+    match = SAN_REGEX.match(san)
+    if match is None:
+        raise UnsupportedMove(san)
+    abbr, file_, rank, dest, promotion = match.groups()
+    if promotion:
+        raise UnsupportedMove(san)
+    abbr = abbr or 'P'
+    # Board keys are plain strings, the regex keeps dest ASCII
+    dest = str(dest.upper())
+    color = chessboard.player_turn
+
+    candidates = []
+    for coord in chessboard.occupied(color):
+        piece = chessboard[coord]
+        if piece.abbriviation.upper() != abbr: continue
+        if file_ and coord[0] != file_.upper(): continue
+        if rank and coord[1] != rank: continue
+        if dest in piece.possible_moves(coord):
+            candidates.append(coord)
+
+    if len(candidates) > 1:
+        candidates = [c for c in candidates
+                      if not chessboard.is_in_check_after_move(c, dest)]
+    if len(candidates) != 1:
+        raise UnsupportedMove(san)
+    return candidates[0], dest
+
+def _strip_variations(movetext):
+    result, depth = [], 0
+    for char in movetext:
+        if char == '(': depth += 1
+        elif char == ')': depth -= 1
+        elif depth == 0: result.append(char)
+    return "".join(result)
+
+def _san_moves(movetext):
+    movetext = _strip_variations(COMMENT_REGEX.sub(' ', movetext))
+    moves = []
+    for token in movetext.split():
+        token = MOVE_NUMBER_REGEX.sub('', token)
+        if not token or token.startswith('$') or token in RESULTS: continue
+        moves.append(token)
+    return moves
+
+def _ends_game(movetext):
+    ''' True if the movetext read so far finishes with a result token '''
+    text = COMMENT_REGEX.sub(' ', movetext)
+    if text.rfind('{') > text.rfind('}'):
+        # Still inside a comment
+        return False
+    tokens = text.split()
+    return bool(tokens) and tokens[-1] in RESULTS
+
+def _decode(line):
+    ''' PGN should be ISO-8859-1, but plenty of archives are UTF-8 '''
+    if isinstance(line, unicode): return line
+    try:
+        return line.decode('utf-8')
+    except UnicodeDecodeError:
+        return line.decode('latin-1')
+
+def read_games(pgn):
+    '''
+        Yield (headers, san_moves) for each game in an open PGN file,
+        one game at a time. A game ends with its result token, or
+        with the headers of the next game. Lines are decoded as UTF-8,
+        or as ISO-8859-1 if they are not valid UTF-8.
+    '''
+    headers, movetext = OrderedDict(), []
+    for line in pgn:
+        line = _decode(line).strip()
+        match = HEADER_REGEX.match(line)
+        if match:
+            if movetext:
+                yield headers, _san_moves("\n".join(movetext))
+                headers, movetext = OrderedDict(), []
+            headers[match.group(1)] = match.group(2)
+        elif line:
+            movetext.append(line)
+            if line.split()[-1] in RESULTS and _ends_game("\n".join(movetext)):
+                yield headers, _san_moves("\n".join(movetext))
+                headers, movetext = OrderedDict(), []
+    if headers or movetext:
+        yield headers, _san_moves("\n".join(movetext))
+
+def analyze_game(headers, moves, depth=1, time_limit=None, cache=None,
+                 blunder_threshold=200):
+    '''
+        Replay a game on a Board and evaluate every position.
+
+        A move is a blunder when it loses at least `blunder_threshold`
+        centipawns for the side that played it.
+    '''
+    result = {'headers': headers, 'moves': [], 'blunders': []}
+    try:
+        chessboard = board.Board(headers.get('FEN'))
+    except board.InvalidFEN:
+        result['error'] = "InvalidFEN: %s" % headers['FEN']
+        return result
+    # Board.history is shared by the class, keep this game's moves apart
+    chessboard.history = []
+    if cache is not None:
+        hits, misses = cache.hits, cache.misses
+
+    before = evaluate(chessboard, depth, time_limit, cache)
+    for ply, san in enumerate(moves, 1):
+        color = chessboard.player_turn
+        try:
+            p1, p2 = parse_san(chessboard, san)
+            chessboard.move(p1, p2)
+        except board.ChessError as error:
+            result['error'] = "%s at ply %d: %s" % (error.__class__.__name__, ply, san)
+            break
+        after = evaluate(chessboard, depth, time_limit, cache)
+        loss = before - after if color == 'white' else after - before
+        blunder = loss >= blunder_threshold
+        result['moves'].append({'ply': ply, 'move': san, 'eval': after,
+                                'loss': loss, 'blunder': blunder})
+        if blunder: result['blunders'].append(ply)
+        before = after
+
+    if cache is not None:
+        result['cache'] = {'hits': cache.hits - hits,
+                           'misses': cache.misses - misses}
+    return result
+
+# Per-process connection to the cache shared by the worker pool
+_worker_cache = None
+
+def _init_worker(cache_path, cache_size):
+    global _worker_cache
+    _worker_cache = DiskPositionCache(cache_path, cache_size)
+
+def _analyze_job(job):
+    headers, moves, options = job
+    result = analyze_game(headers, moves, cache=_worker_cache, **options)
+    # The pool is terminated, not closed, so write this game's scores now
+    _worker_cache.flush()
+    return result
+
+def _batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch: yield batch
+
+def iter_analysis(pgn_path, depth=1, time_limit=None, workers=1,
+                  cache_size=100000, cache_path=None, blunder_threshold=200):
+    '''
+        Yield the analysis of every game in `pgn_path`, in file order.
+
+        Scores are cached by position. A single process keeps them in
+        memory unless `cache_path` names a sqlite file to keep them in.
+        With `workers` > 1 games are analysed by a process pool that
+        shares that file, or a temporary one. Games are read in small
+        batches so memory does not grow with the size of the archive.
+    '''
+    options = {'depth': depth, 'time_limit': time_limit,
+               'blunder_threshold': blunder_threshold}
+    with open(pgn_path) as pgn:
+        games = read_games(pgn)
+        if workers <= 1:
+            if cache_path: cache = DiskPositionCache(cache_path, cache_size)
+            else: cache = PositionCache(cache_size)
+            try:
+                for headers, moves in games:
+                    yield analyze_game(headers, moves, cache=cache, **options)
+            finally:
+                if cache_path: cache.close()
+            return
+
+        import multiprocessing
+        tmpdir = None
+        if cache_path is None:
+            tmpdir = tempfile.mkdtemp()
+            cache_path = os.path.join(tmpdir, 'positions.db')
+        # Create the table before the workers race to do it
+        DiskPositionCache(cache_path, cache_size).close()
+        pool = multiprocessing.Pool(workers, _init_worker,
+                                    (cache_path, cache_size))
+        try:
+            jobs = ((headers, moves, options) for headers, moves in games)
+            for batch in _batches(jobs, workers * 4):
+                for result in pool.imap(_analyze_job, batch):
+                    yield result
+        finally:
+            pool.terminate()
+            pool.join()
+            if tmpdir: shutil.rmtree(tmpdir)
+
+def analyze_games(pgn_path, out=None, **kwargs):
+    '''
+        Analyse every game in `pgn_path` and write one JSON line per game
+        to `out` (stdout by default). Returns the number of games.
+        Keyword arguments are passed on to iter_analysis.
+    '''
+    if out is None: out = sys.stdout
+    count = 0
+    for count, result in enumerate(iter_analysis(pgn_path, **kwargs), 1):
+        result['game'] = count
+        out.write(json.dumps(result) + "\n")
+        out.flush()
+    return count
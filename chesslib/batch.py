@@ -0,0 +1,66 @@
+import sys
+
+import board
+
+class BoardBatch(object):
+    '''
+        Apply a script of moves and commands to a board without any GUI.
+
+        One command per line:
+
+            E2E4        move in chess notation
+            fen         print the current position
+            load FEN    replace the position
+            exit        stop reading
+
+        Blank lines and lines starting with "#" are ignored.
+    '''
+
+    def __init__(self, chessboard, output=None, errors=None):
+        self.board = chessboard
+        self.output = output or sys.stdout
+        self.errors = errors or sys.stderr
+
+    def run(self, script):
+        '''
+            Play every line of `script`, return the number of errors.
+        '''
+        failed = 0
+        for number, line in enumerate(script, 1):
+            command = line.strip()
+            if not command or command[0] == '#':
+                continue
+            if command == 'exit':
+                break
+            try:
+                if command == 'fen':
+                    self.output.write(self.board.export() + "\n")
+                elif command.startswith('load '):
+                    self.board.load(command[5:].strip())
+                elif len(command) == 4:
+                    self.move(command[0:2], command[2:4])
+                else:
+                    raise board.InvalidCoord
+            except board.ChessError as error:
+                failed += 1
+                self.errors.write("line %d: %s: Error: %s\n" %
+                                  (number, command, error.__class__.__name__))
+        return failed
+
+    def move(self, p1, p2):
+        try:
+            piece = self.board[p1]
+            self.board[p2]
+        except KeyError:
+            raise board.InvalidCoord
+        if piece is None:
+            raise board.InvalidMove
+        self.board.move(p1, p2)
+
+
+def display(board, script=None):
+    if script is None: script = sys.stdin
+    gui = BoardBatch(board)
+    failed = gui.run(script)
+    gui.output.write(board.export() + "\n")
+    return failed
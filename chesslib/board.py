@@ -1,5 +1,4 @@
 from itertools import groupby
-from copy import deepcopy
 
 import pieces
 import re
@@ -12,6 +11,7 @@ class Check(ChessError): pass
 class CheckMate(ChessError): pass
 class Draw(ChessError): pass
 class NotYourTurn(ChessError): pass
+class InvalidFEN(ChessError): pass
 
 FEN_STARTING = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
 RANK_REGEX = re.compile(r"^[A-Z][1-8]$")
@@ -60,10 +60,14 @@ class Board(dict):
     def save_to_file(self): pass
 
     def is_in_check_after_move(self, p1, p2):
-        # Create a temporary board
-        tmp = deepcopy(self)
-        tmp._do_move(p1,p2)
-        return tmp.is_in_check(self[p1].color)
+        # Try the move on this board, then take it back
+        piece = self[p1]
+        captured = self[p2]
+        self._do_move(p1,p2)
+        try:
+            return self.is_in_check(piece.color)
+        finally:
+            self._undo_move(p1, p2, piece, captured)
 
     def move(self, p1, p2):
         p1, p2 = p1.upper(), p2.upper()
@@ -80,7 +84,7 @@ class Board(dict):
             raise InvalidMove
 
         # If enemy has any moves look for check
-        if self.all_possible_moves(enemy):
+        if self.has_possible_moves(enemy):
             if self.is_in_check_after_move(p1,p2):
                 raise Check
 
@@ -105,6 +109,14 @@ class Board(dict):
         del self[p1]
         self[p2] = piece
 
+    def _undo_move(self, p1, p2, piece, captured):
+        '''
+            Take back a move made with _do_move
+        '''
+        self[p1] = piece
+        if captured is None: del self[p2]
+        else: self[p2] = captured
+
     def _finish_move(self, piece, dest, p1, p2):
         '''
             Set next player turn, count moves, log moves, etc.
@@ -139,12 +151,22 @@ class Board(dict):
         '''
         if(color not in ("black", "white")): raise InvalidColor
         result = []
-        for coord in self.keys():
-            if (self[coord] is not None) and self[coord].color == color:
-                moves = self[coord].possible_moves(coord)
+        for coord, piece in self.items():
+            if piece.color == color:
+                moves = piece.possible_moves(coord)
                 if moves: result += moves
         return result
 
+    def has_possible_moves(self, color):
+        '''
+            Like all_possible_moves, but stop at the first piece that can move.
+        '''
+        if(color not in ("black", "white")): raise InvalidColor
+        for coord, piece in self.items():
+            if piece.color == color and piece.possible_moves(coord):
+                return True
+        return False
+
     def occupied(self, color):
         '''
             Return a list of coordinates occupied by `color`
@@ -152,8 +174,8 @@ class Board(dict):
         result = []
         if(color not in ("black", "white")): raise InvalidColor
 
-        for coord in self:
-            if self[coord].color == color:
+        for coord, piece in self.items():
+            if piece.color == color:
                 result.append(coord)
         return result
 
@@ -194,30 +216,42 @@ class Board(dict):
 
     def load(self, fen):
         '''
-            Import state from FEN notation
+            Import state from FEN notation.
+            Raises InvalidFEN and leaves the board untouched if `fen`
+            cannot be parsed.
         '''
-        self.clear()
         # Split data
         fen = fen.split(' ')
         # Expand blanks
         def expand(match): return ' ' * int(match.group(0))
 
-        fen[0] = re.compile(r'\d').sub(expand, fen[0])
+        try:
+            rows = re.compile(r'\d').sub(expand, fen[0]).split('/')
+            if len(rows) != 8 or [len(row) for row in rows] != [8] * 8:
+                raise ValueError
+            placed = {}
+            for x, row in enumerate(rows):
+                for y, letter in enumerate(row):
+                    if letter == ' ': continue
+                    placed[self.letter_notation((7-x,y))] = pieces.piece(letter)
+            if fen[1] not in ('w', 'b'): raise ValueError
+            castling, en_passant = fen[2], fen[3]
+            halfmove_clock, fullmove_number = int(fen[4]), int(fen[5])
+        except (IndexError, KeyError, ValueError):
+            raise InvalidFEN(" ".join(fen))
 
-        for x, row in enumerate(fen[0].split('/')):
-            for y, letter in enumerate(row):
-                if letter == ' ': continue
-                coord = self.letter_notation((7-x,y))
-                self[coord] = pieces.piece(letter)
-                self[coord].place(self)
+        self.clear()
+        for coord, piece in placed.items():
+            self[coord] = piece
+            piece.place(self)
 
         if fen[1] == 'w': self.player_turn = 'white'
         else: self.player_turn = 'black'
 
-        self.castling = fen[2]
-        self.en_passant = fen[3]
-        self.halfmove_clock = int(fen[4])
-        self.fullmove_number = int(fen[5])
+        self.castling = castling
+        self.en_passant = en_passant
+        self.halfmove_clock = halfmove_clock
+        self.fullmove_number = fullmove_number
 
     def export(self):
         '''
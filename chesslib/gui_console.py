@@ -1,6 +1,6 @@
 # -*- encoding: utf-8 -*-
 import board
-import os
+import sys
 
 UNICODE_PIECES = {
   'r': u'♜', 'n': u'♞', 'b': u'♝', 'q': u'♛',
@@ -9,6 +9,13 @@ UNICODE_PIECES = {
   None: ' '
 }
 
+# ANSI escape: clear the screen and move the cursor home
+CLEAR_SCREEN = "\033[2J\033[H"
+
+def clear():
+    sys.stdout.write(CLEAR_SCREEN)
+    sys.stdout.flush()
+
 class BoardGuiConsole(object):
     '''
         Print a text-mode chessboard using the unicode chess pieces
@@ -19,23 +26,21 @@ class BoardGuiConsole(object):
         self.board = chessboard
 
     def move(self):
-        os.system("clear")
-        self.unicode_representation()
-        print "\n", self.error
-        print "State a move in chess notation (e.g. A2A3). Type \"exit\" to leave:\n", ">>>",
-        self.error = ''
-        coord = raw_input()
-        if coord == "exit":
-            print "Bye."
-            exit(0)
-        try:
-            if len(coord) != 4: raise board.InvalidCoord
-            self.board.move(coord[0:2], coord[2:4])
-            os.system("clear")
-        except board.ChessError as error:
-            self.error = "Error: %s" % error.__class__.__name__
-
-        self.move()
+        while True:
+            clear()
+            self.unicode_representation()
+            print "\n", self.error
+            print "State a move in chess notation (e.g. A2A3). Type \"exit\" to leave:\n", ">>>",
+            self.error = ''
+            coord = raw_input()
+            if coord == "exit":
+                print "Bye."
+                exit(0)
+            try:
+                if len(coord) != 4: raise board.InvalidCoord
+                self.board.move(coord[0:2], coord[2:4])
+            except board.ChessError as error:
+                self.error = "Error: %s" % error.__class__.__name__
 
     def unicode_representation(self):
         print "\n", ("%s's turn\n" % self.board.player_turn.capitalize()).center(28)
@@ -55,5 +60,5 @@ def display(board):
         gui = BoardGuiConsole(board)
         gui.move()
     except (KeyboardInterrupt, EOFError):
-        os.system("clear")
+        clear()
         exit(0)
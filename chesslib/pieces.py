@@ -52,6 +52,8 @@ class Piece(object):
         piece = self
 
         from_ = board.number_notation(position)
+        own     = board.occupied(piece.color)
+        blocked = own + board.occupied(board.get_enemy(piece.color))
         if orthogonal and diagonal:
             directions = diag+orth
         elif diagonal:
@@ -64,9 +66,9 @@ class Piece(object):
             for step in range(1, distance+1):
                 if collision: break
                 dest = from_[0]+step*x, from_[1]+step*y
-                if self.board.letter_notation(dest) not in board.occupied('white') + board.occupied('black'):
+                if self.board.letter_notation(dest) not in blocked:
                     legal_moves.append(dest)
-                elif self.board.letter_notation(dest) in board.occupied(piece.color):
+                elif self.board.letter_notation(dest) in own:
                     collision = True
                 else:
                     legal_moves.append(dest)
@@ -110,9 +112,10 @@ class Pawn(Piece):
                     legal_moves.append(double_forward)
 
         # Attacking
+        enemies = board.occupied(enemy)
         for a in range(-1, 2, 2):
             attack = from_[0] + direction, from_[1] + a
-            if board.letter_notation(attack) in board.occupied(enemy):
+            if board.letter_notation(attack) in enemies:
                 legal_moves.append(attack)
 
         # TODO: En passant
@@ -129,10 +132,11 @@ class Knight(Piece):
         from_ = board.number_notation(position)
         piece = board.get(position)
         deltas = ((-2,-1),(-2,1),(-1,-2),(-1,2),(1,-2),(1,2),(2,-1),(2,1))
+        own = board.occupied(piece.color)
 
         for x,y in deltas:
             dest = from_[0]+x, from_[1]+y
-            if(board.letter_notation(dest) not in board.occupied(piece.color)):
+            if(board.letter_notation(dest) not in own):
                 legal_moves.append(dest)
 
         legal_moves = filter(board.is_in_bounds, legal_moves)
@@ -0,0 +1,242 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from StringIO import StringIO
+
+from chesslib import analysis, board
+
+class ParseSanTest(unittest.TestCase):
+
+    def test_pawn_moves(self):
+        game = board.Board()
+        self.assertEqual(analysis.parse_san(game, 'e4'), ('E2', 'E4'))
+        game.move('E2', 'E4')
+        game.move('D7', 'D5')
+        self.assertEqual(analysis.parse_san(game, 'exd5'), ('E4', 'D5'))
+
+    def test_disambiguation(self):
+        # Knights on b1 and f1 both reach d2
+        game = board.Board('4k3/8/8/8/8/8/8/1N1K1N2 w - - 0 1')
+        self.assertEqual(analysis.parse_san(game, 'Nbd2'), ('B1', 'D2'))
+        self.assertEqual(analysis.parse_san(game, 'Nfd2'), ('F1', 'D2'))
+        self.assertRaises(analysis.UnsupportedMove,
+                          analysis.parse_san, game, 'Nd2')
+        # Knights on a1 and a5 both reach b3
+        game = board.Board('4k3/8/8/N7/8/8/8/N3K3 w - - 0 1')
+        self.assertEqual(analysis.parse_san(game, 'N1b3'), ('A1', 'B3'))
+        self.assertEqual(analysis.parse_san(game, 'N5b3+'), ('A5', 'B3'))
+
+    def test_pinned_piece_is_not_a_candidate(self):
+        # The e2 knight is pinned by the e8 rook, so only b5 can go to c3
+        game = board.Board('4r2k/8/8/1N6/8/8/4N3/4K3 w - - 0 1')
+        self.assertEqual(analysis.parse_san(game, 'Nc3'), ('B5', 'C3'))
+        self.assertEqual(len(game), 5)
+
+    def test_unsupported_moves(self):
+        game = board.Board()
+        for san in ('O-O', 'e8=Q', 'Nc4', 'xyz'):
+            self.assertRaises(analysis.UnsupportedMove,
+                              analysis.parse_san, game, san)
+
+class ReadGamesTest(unittest.TestCase):
+
+    def games(self, pgn):
+        return [(dict(headers), moves) for headers, moves
+                in analysis.read_games(StringIO(pgn))]
+
+    def test_comments_variations_and_nags(self):
+        pgn = ('[Event "a"]\n[White "x"]\n\n'
+               '1. e4 {best by test} e5 $1 2. Nf3 (2. f4 exf4 (2... d5)) '
+               '; rest of line\nNc6 {a comment\nover two lines 1-0} 3. Bb5 1/2-1/2\n')
+        self.assertEqual(self.games(pgn), [
+            ({'Event': 'a', 'White': 'x'}, ['e4', 'e5', 'Nf3', 'Nc6', 'Bb5'])])
+
+    def test_result_token_ends_a_game(self):
+        pgn = '[Event "y"]\n\n1. e4 e5 *\n1. d4 d5 0-1\n\n[Event "z"]\n1. c4 1-0\n'
+        self.assertEqual(self.games(pgn), [
+            ({'Event': 'y'}, ['e4', 'e5']),
+            ({}, ['d4', 'd5']),
+            ({'Event': 'z'}, ['c4'])])
+
+    def test_latin1_and_utf8_headers(self):
+        pgn = '[White "M\xfcller"]\n[Black "J\xc3\xb6rg"]\n\n1. e4 *\n'
+        self.assertEqual(self.games(pgn), [
+            ({'White': u'M\xfcller', 'Black': u'J\xf6rg'}, ['e4'])])
+
+    def test_game_without_result(self):
+        pgn = '[Event "a"]\n1. e4 e5\n[Event "b"]\n1. d4\n'
+        self.assertEqual(self.games(pgn), [
+            ({'Event': 'a'}, ['e4', 'e5']), ({'Event': 'b'}, ['d4'])])
+
+class CacheTest(unittest.TestCase):
+
+    def check_lru(self, cache):
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.put('c', 3)
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get('b'), None)
+        self.assertEqual(cache.get('a'), 1)
+        self.assertEqual(cache.get('c'), 3)
+        self.assertEqual((cache.hits, cache.misses), (3, 1))
+
+    def test_memory_cache_evicts_least_recently_used(self):
+        self.check_lru(analysis.PositionCache(2))
+
+    def disk_cache(self, **kwargs):
+        return analysis.DiskPositionCache(self.path, 2, **kwargs)
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'positions.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_disk_cache_evicts_least_recently_used(self):
+        cache = self.disk_cache()
+        self.check_lru(cache)
+        cache.close()
+        # Scores outlive the connection
+        cache = self.disk_cache()
+        self.assertEqual(cache.get('c'), 3)
+        cache.close()
+
+    def test_disk_cache_order_does_not_depend_on_the_clock(self):
+        clock = analysis.time.time
+        analysis.time.time = lambda: 1000.0
+        try:
+            self.check_lru(self.disk_cache(flush_every=1))
+        finally:
+            analysis.time.time = clock
+
+    def test_disk_cache_is_shared_between_connections(self):
+        first = self.disk_cache(flush_every=1, memory_size=0)
+        second = self.disk_cache(flush_every=1, memory_size=0)
+        first.put('a', 1)
+        second.put('b', 2)
+        self.assertEqual(second.get('a'), 1)
+        first.put('c', 3)
+        self.assertEqual([first.get(key) for key in 'abc'], [1, None, 3])
+        first.close()
+        second.close()
+
+    def test_zero_score_is_cached(self):
+        cache = analysis.PositionCache()
+        cache.put('a', 0)
+        self.assertEqual(cache.get('a'), 0)
+
+class EvaluateTest(unittest.TestCase):
+
+    def test_material(self):
+        game = board.Board('4k3/8/8/8/8/8/8/3QK3 w - - 0 1')
+        self.assertEqual(analysis.evaluate(game, 0), 900)
+        game = board.Board('4k3/8/8/8/8/8/8/3QK3 b - - 0 1')
+        self.assertEqual(analysis.evaluate(game, 1), 900)
+
+    def test_capture(self):
+        # White to move takes the queen on d2
+        game = board.Board('4k3/8/8/8/8/8/3q4/3RK3 w - - 0 1')
+        self.assertEqual(analysis.evaluate(game, 1), 500)
+        self.assertEqual(analysis.evaluate(game, 0), 500)
+
+    def test_time_limit_stops_the_search(self):
+        game = board.Board(
+            'r1bqkb1r/pppp1ppp/2n2n2/4p3/2B1P3/5N2/PPPP1PPP/RNBQK2R w KQkq - 4 4')
+        before = game.export()
+        cache = analysis.PositionCache()
+        # Each look at the clock moves it on by 10ms
+        ticks = [0]
+        def clock():
+            ticks[0] += 1
+            return ticks[0] * 0.01
+        real_clock, analysis.time.time = analysis.time.time, clock
+        try:
+            analysis.evaluate(game, 4, 0.05, cache)
+            analysis.evaluate(game, 4, 0.05, cache)
+        finally:
+            analysis.time.time = real_clock
+        # The search was cut short twice, and the unfinished score kept
+        # out of the cache
+        self.assertTrue(ticks[0] < 20)
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (0, 2, 0))
+        self.assertEqual(game.export(), before)
+
+    def test_finished_time_limited_search_is_cached(self):
+        game = board.Board('4k3/8/8/8/8/8/3q4/3RK3 w - - 0 1')
+        cache = analysis.PositionCache()
+        self.assertEqual(analysis.evaluate(game, 1, 60, cache), 500)
+        self.assertEqual(analysis.evaluate(game, 1, None, cache), 500)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+class AnalyzeGameTest(unittest.TestCase):
+
+    def test_blunder(self):
+        # 2. Qg4?? hangs the queen to the c8 bishop
+        result = analysis.analyze_game({}, ['e4', 'd5', 'Qg4', 'Bxg4'],
+                                       cache=analysis.PositionCache())
+        self.assertEqual(result['blunders'], [3])
+        self.assertEqual(result['cache'], {'hits': 0, 'misses': 5})
+        self.assertFalse('error' in result)
+
+    def test_unsupported_move(self):
+        result = analysis.analyze_game({}, ['e4', 'e5', 'O-O'], depth=0)
+        self.assertEqual(len(result['moves']), 2)
+        self.assertEqual(result['error'], 'UnsupportedMove at ply 3: O-O')
+
+    def test_bad_fen_header(self):
+        result = analysis.analyze_game({'FEN': '8/8/8/8/8/8/8/X7 w - - 0 1'},
+                                       ['e4'], depth=0)
+        self.assertEqual(result['moves'], [])
+        self.assertTrue(result['error'].startswith('InvalidFEN'))
+
+class AnalyzeGamesTest(unittest.TestCase):
+
+    PGN = ('[Event "a"]\n\n1. e4 e5 2. Nf3 *\n\n'
+           '[FEN "garbage"]\n\n1. e4 *\n\n'
+           '[Event "c"]\n\n1. e4 e5 2. Nf3 *\n')
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'games.pgn')
+        with open(self.path, 'w') as pgn:
+            pgn.write(self.PGN)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def analyze(self, **kwargs):
+        out = StringIO()
+        count = analysis.analyze_games(self.path, out, depth=0, **kwargs)
+        lines = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(count, len(lines))
+        return lines
+
+    def test_one_line_per_game(self):
+        games = self.analyze()
+        self.assertEqual([game['game'] for game in games], [1, 2, 3])
+        self.assertTrue('error' in games[1])
+        # The third game repeats the first one
+        self.assertEqual(games[2]['cache'], {'hits': 4, 'misses': 0})
+
+    def test_latin1_header(self):
+        with open(self.path, 'w') as pgn:
+            pgn.write('[White "M\xfcller"]\n\n1. e4 e5 *\n')
+        games = self.analyze()
+        self.assertEqual(games[0]['headers'], {'White': u'M\xfcller'})
+        self.assertEqual(len(games[0]['moves']), 2)
+
+    def test_workers_share_the_cache(self):
+        path = os.path.join(self.tmpdir, 'positions.db')
+        first = self.analyze(workers=2, cache_path=path)
+        self.assertEqual([game['game'] for game in first], [1, 2, 3])
+        again = self.analyze(workers=2, cache_path=path)
+        self.assertEqual(again[0]['cache'], {'hits': 4, 'misses': 0})
+        self.assertEqual([game['moves'] for game in again],
+                         [game['moves'] for game in first])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import sys
+import unittest
+from StringIO import StringIO
+
+from chesslib import batch, board
+
+class BoardBatchTest(unittest.TestCase):
+
+    def run_script(self, script):
+        self.board = board.Board()
+        self.output, self.errors = StringIO(), StringIO()
+        gui = batch.BoardBatch(self.board, self.output, self.errors)
+        return gui.run(StringIO(script))
+
+    def test_moves_and_fen(self):
+        failed = self.run_script('# opening\n\nE2E4\ne7e5\nfen\n')
+        self.assertEqual(failed, 0)
+        self.assertEqual(self.output.getvalue(),
+            'rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 1 2\n')
+        self.assertEqual(self.errors.getvalue(), '')
+
+    def test_errors_are_reported_per_line(self):
+        failed = self.run_script('Z9A1\nE3E4\nE7E5\nE2\nE2E5\n')
+        self.assertEqual(failed, 5)
+        self.assertEqual(self.errors.getvalue().splitlines(), [
+            'line 1: Z9A1: Error: InvalidCoord',
+            'line 2: E3E4: Error: InvalidMove',
+            'line 3: E7E5: Error: NotYourTurn',
+            'line 4: E2: Error: InvalidCoord',
+            'line 5: E2E5: Error: InvalidMove'])
+        self.assertEqual(self.board.export(), board.FEN_STARTING)
+
+    def test_exit_stops_reading(self):
+        self.assertEqual(self.run_script('E2E4\nexit\nE7E5\n'), 0)
+        self.assertEqual(self.board.player_turn, 'black')
+
+    def test_load(self):
+        fen = '4k3/8/8/8/8/8/8/4K3 b - - 3 40'
+        self.assertEqual(self.run_script('load %s\nE8D8\nfen\n' % fen), 0)
+        self.assertEqual(self.output.getvalue(),
+                         '3k4/8/8/8/8/8/8/4K3 w - - 4 41\n')
+
+    def test_bad_load_leaves_the_board_alone(self):
+        failed = self.run_script('E2E4\nload garbage\n'
+                                 'load 8/8/8/8/8/8/8/X7 w - - 0 1\nE7E5\n')
+        self.assertEqual(failed, 2)
+        self.assertEqual(self.errors.getvalue().splitlines(), [
+            'line 2: load garbage: Error: InvalidFEN',
+            'line 3: load 8/8/8/8/8/8/8/X7 w - - 0 1: Error: InvalidFEN'])
+        self.assertEqual(self.board.export(),
+            'rnbqkbnr/pppp1ppp/8/4p3/4P3/8/PPPP1PPP/RNBQKBNR w KQkq - 1 2')
+
+    def test_display_prints_final_position(self):
+        stdout, stderr = sys.stdout, sys.stderr
+        sys.stdout, sys.stderr = StringIO(), StringIO()
+        try:
+            failed = batch.display(board.Board(), StringIO('E2E4\nE2E4\n'))
+            output = sys.stdout.getvalue()
+        finally:
+            sys.stdout, sys.stderr = stdout, stderr
+        self.assertEqual(failed, 1)
+        self.assertEqual(output,
+            'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1\n')
+
+if __name__ == '__main__':
+    unittest.main()